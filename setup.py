@@ -2,8 +2,10 @@
 Setup script for Kasparro Agentic Facebook Analyst.
 """
 
+import hashlib
 import os
 import subprocess
+from importlib import metadata
 from pathlib import Path
 
 
@@ -38,14 +40,42 @@ def create_env_file():
             print("⚠ Please add your GROQ_API_KEY to .env")
 
 
+REQUIREMENTS_STAMP = ".requirements.sha256"
+
+
+def requirements_hash():
+    """Return the SHA-256 of requirements.txt."""
+    return hashlib.sha256(Path("requirements.txt").read_bytes()).hexdigest()
+
+
+def requirements_installed():
+    """Check that every distribution in requirements.txt is installed."""
+    for line in Path("requirements.txt").read_text().splitlines():
+        name = line.split("#")[0].split("==")[0].strip()
+        if not name:
+            continue
+        try:
+            metadata.version(name)
+        except metadata.PackageNotFoundError:
+            return False
+    return True
+
+
 def install_dependencies():
     """Install Python dependencies."""
+    stamp = Path(REQUIREMENTS_STAMP)
+    current_hash = requirements_hash()
+    if stamp.exists() and stamp.read_text().strip() == current_hash and requirements_installed():
+        print("\n✓ Dependencies up-to-date")
+        return
+    
     print("\n📦 Installing dependencies...")
     try:
         subprocess.run(
             ["pip", "install", "-r", "requirements.txt"],
             check=True
         )
+        stamp.write_text(current_hash + "\n")
         print("✓ Dependencies installed")
     except subprocess.CalledProcessError as e:
         print(f"✗ Error installing dependencies: {e}")
@@ -3,10 +3,22 @@ Creative Generator: Generates ad creative suggestions.
 """
 
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from loguru import logger
 import pandas as pd
 
+from agents.prompt_loader import load_prompt
+from json_utils import extract_fenced_json
+
+# Creative angles used when the LLM output is unavailable
+_DEFAULT_ANGLES = (
+    "Value Proposition",
+    "Urgency-Based",
+    "Benefit-Focused",
+    "Problem-Solution",
+    "Social Proof"
+)
+
 
 class CreativeGenerator:
     """
@@ -20,6 +32,22 @@ class CreativeGenerator:
         self.goal = "Generate compelling ad creatives based on insights"
         self.backstory = """Copywriter and creative strategist specializing in 
         high-converting ad messaging for performance marketing."""
+        
+        # Precompute per-campaign lookups once; df is not modified afterwards
+        self._by_campaign = {}
+        self._avg_roas = None
+        self._roas_q25 = float(df['roas'].quantile(0.25)) if 'roas' in df.columns else None
+        self._sample_creatives = {}
+        if 'campaign_name' in df.columns and len(df) > 0:
+            by_campaign = df.groupby('campaign_name', observed=True)
+            self._by_campaign = dict(tuple(by_campaign))
+            if 'creative_message' in df.columns:
+                self._sample_creatives = {
+                    name: group['creative_message'].drop_duplicates().head(3).tolist()
+                    for name, group in self._by_campaign.items()
+                }
+            if 'roas' in df.columns:
+                self._avg_roas = by_campaign['roas'].mean()
     
     def generate_creatives(self, 
                           insights: Dict[str, Any], 
@@ -46,15 +74,27 @@ class CreativeGenerator:
             return []
         
         creatives = []
+        campaigns = target_campaigns[:5]  # Limit to top 5
+        
+        # Serialize the shared hypotheses once rather than per campaign prompt
+        hypotheses_json = json.dumps(insights.get('hypotheses', []), indent=2, default=str)
+        
+        # Read the creative prompt
+        system_prompt = load_prompt("creative_prompt.md", "You are a creative strategist.")
+        
+        # Campaign prompts are independent, so submit them to the LLM as one batch
+        prompts = [
+            (system_prompt, self._build_prompt(campaign_name, hypotheses_json, validated_insights, num_suggestions))
+            for campaign_name in campaigns
+        ]
+        try:
+            responses = self.llm.generate_many(prompts)
+        except Exception as e:
+            logger.error(f"Error generating creatives: {e}")
+            responses = [None] * len(campaigns)
         
-        for campaign_name in target_campaigns[:5]:  # Limit to top 5
-            campaign_creatives = self._generate_for_campaign(
-                campaign_name, 
-                insights,
-                validated_insights,
-                num_suggestions
-            )
-            creatives.extend(campaign_creatives)
+        for campaign_name, response in zip(campaigns, responses):
+            creatives.extend(self._creatives_from_response(response, campaign_name, num_suggestions))
         
         logger.info(f"Generated {len(creatives)} creative suggestions")
         return creatives
@@ -63,44 +103,24 @@ class CreativeGenerator:
         """Identify campaigns that need creative refresh (low ROAS, low CTR)."""
         target_campaigns = []
         
-        if len(self.df) == 0:
-            return target_campaigns
-        
         # Find campaigns with poor performance
-        if 'roas' in self.df.columns and 'campaign_name' in self.df.columns:
-            avg_roas_by_campaign = self.df.groupby('campaign_name')['roas'].mean()
-            low_performers = avg_roas_by_campaign[
-                avg_roas_by_campaign < self.df['roas'].quantile(0.25)
-            ]
+        if self._avg_roas is not None:
+            low_performers = self._avg_roas[self._avg_roas < self._roas_q25]
             target_campaigns = low_performers.index.tolist()
         
         return target_campaigns
     
-    def _generate_for_campaign(self,
-                               campaign_name: str,
-                               insights: Dict[str, Any],
-                               validated_insights: Dict[str, Any],
-                               num_suggestions: int) -> List[Dict[str, Any]]:
-        """Generate creatives for a specific campaign."""
+    def _build_prompt(self,
+                      campaign_name: str,
+                      hypotheses_json: str,
+                      validated_insights: Dict[str, Any],
+                      num_suggestions: int) -> str:
+        """Build the creative generation prompt for a specific campaign."""
         
         # Get existing creative for context
-        campaign_data = self.df[self.df['campaign_name'] == campaign_name]
-        existing_creatives = campaign_data['creative_message'].unique().tolist()[:3]
+        existing_creatives = self._sample_creatives.get(campaign_name, [])
         
-        # Read the creative prompt
-        try:
-            with open("../prompts/creative_prompt.md", "r") as f:
-                system_prompt = f.read()
-        except FileNotFoundError:
-            try:
-                with open("prompts/creative_prompt.md", "r") as f:
-                    system_prompt = f.read()
-            except FileNotFoundError:
-                logger.warning("Creative prompt file not found")
-                system_prompt = "You are a creative strategist."
-        
-        # Build the generation prompt
-        user_prompt = f"""
+        return f"""
         Generate {num_suggestions} new creative ideas for this campaign:
         
         Campaign: {campaign_name}
@@ -109,35 +129,31 @@ class CreativeGenerator:
         {json.dumps(existing_creatives, indent=2)}
         
         Insights:
-        {json.dumps(insights.get('hypotheses', []), indent=2)}
+        {hypotheses_json}
         
         Performance Issues: {validated_insights.get('recommendation', {}).get('action', 'General optimization')}
         
         Generate new headline and message combinations that address the issues.
         """
+    
+    def _creatives_from_response(self,
+                                 response: Optional[str],
+                                 campaign_name: str,
+                                 num_suggestions: int) -> List[Dict[str, Any]]:
+        """Turn one campaign's LLM response into creatives, falling back to defaults."""
+        if response is None:
+            return self._default_creatives(campaign_name, num_suggestions)
         
         try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt
-            )
-            
-            parsed_creatives = self._parse_response(response, campaign_name)
-            return parsed_creatives
-            
+            return self._parse_response(response, campaign_name)
         except Exception as e:
             logger.error(f"Error generating creatives: {e}")
             return self._default_creatives(campaign_name, num_suggestions)
     
     def _parse_response(self, response: str, campaign_name: str) -> List[Dict[str, Any]]:
         """Parse LLM response into creative suggestions."""
-        response = response.strip()
-        
         # Extract JSON from markdown if present
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0].strip()
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0].strip()
+        response = extract_fenced_json(response)
         
         try:
             data = json.loads(response)
@@ -167,25 +183,18 @@ class CreativeGenerator:
         logger.info(f"Using default creatives for {campaign_name}")
         
         # Get existing creative for inspiration
-        campaign_data = self.df[self.df['campaign_name'] == campaign_name]
-        existing = campaign_data['creative_message'].iloc[0] if len(campaign_data) > 0 else "No creative available"
-        
-        angles = [
-            "Value Proposition",
-            "Urgency-Based",
-            "Benefit-Focused",
-            "Problem-Solution",
-            "Social Proof"
-        ]
+        samples = self._sample_creatives.get(campaign_name)
+        existing = samples[0] if samples else "No creative available"
+        message_prefix = f"Based on existing creative: {existing[:100]}... Our new angle: "
         
         creatives = []
-        for i, angle in enumerate(angles[:num]):
+        for i, angle in enumerate(_DEFAULT_ANGLES[:num]):
             creatives.append({
                 "id": f"{campaign_name}_creative_{i+1}",
                 "campaign_name": campaign_name,
                 "angle": angle,
                 "headline": f"{angle} - Campaign Headline",
-                "message": f"Based on existing creative: {existing[:100]}... Our new angle: {angle}",
+                "message": message_prefix + angle,
                 "target_ctr": "2.0-3.0%",
                 "rationale": f"Testing {angle.lower()} approach for better engagement"
             })
@@ -2,10 +2,18 @@
 Data Agent: Summarizes dataset and identifies key patterns.
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, List
 from loguru import logger
-import json
+
+# Significant decimal digits a float32-stored metric actually carries
+_FLOAT32_DIGITS = 7
+
+
+def _round_float32(value: float) -> float:
+    """Drop float32 storage noise from a reported value (1.9, not 1.899999976158142)."""
+    return float(f"{value:.{_FLOAT32_DIGITS}g}")
 
 
 class DataAgent:
@@ -49,59 +57,60 @@ class DataAgent:
     
     def _calculate_metrics(self, df: pd.DataFrame) -> Dict[str, float]:
         """Calculate summary statistics for key metrics."""
-        metrics = {}
-        
-        if 'roas' in df.columns:
-            metrics['roas'] = {
-                "mean": float(df['roas'].mean()),
-                "median": float(df['roas'].median()),
-                "std": float(df['roas'].std()),
-                "min": float(df['roas'].min()),
-                "max": float(df['roas'].max())
-            }
-        
-        if 'ctr' in df.columns:
-            metrics['ctr'] = {
-                "mean": float(df['ctr'].mean()),
-                "median": float(df['ctr'].median()),
-                "std": float(df['ctr'].std())
-            }
-        
-        if 'spend' in df.columns:
-            metrics['spend'] = {
-                "total": float(df['spend'].sum()),
-                "mean": float(df['spend'].mean()),
-                "median": float(df['spend'].median())
-            }
-        
-        return metrics
+        # Output key -> aggregation name, per metric column
+        wanted = {
+            'roas': {"mean": "mean", "median": "median", "std": "std", "min": "min", "max": "max"},
+            'ctr': {"mean": "mean", "median": "median", "std": "std"},
+            'spend': {"total": "sum", "mean": "mean", "median": "median"}
+        }
+        present = [col for col in wanted if col in df.columns]
+        if not present:
+            return {}
+
+        # Single aggregation pass over all metric columns, in float64 even when
+        # the columns are stored as float32, so sums and means stay exact
+        stats = df[present].astype('float64').agg(['mean', 'median', 'std', 'min', 'max', 'sum']).to_dict()
+
+        return {
+            col: {key: _round_float32(stats[col][agg]) for key, agg in wanted[col].items()}
+            for col in present
+        }
     
     def _identify_patterns(self, df: pd.DataFrame) -> List[str]:
         """Identify patterns in the data."""
         patterns = []
         
+        # Pull metric columns out once; all checks below work on these arrays
+        roas = df['roas'].to_numpy(dtype=float) if 'roas' in df.columns else None
+        spend = df['spend'].to_numpy(dtype=float) if 'spend' in df.columns else None
+        
         # Check for declining ROAS over time
-        if 'date' in df.columns and 'roas' in df.columns:
-            df_sorted = df.sort_values('date')
-            if len(df_sorted) > 10:
-                recent_roas = df_sorted.tail(len(df_sorted) // 4)['roas'].mean()
-                early_roas = df_sorted.head(len(df_sorted) // 4)['roas'].mean()
+        if 'date' in df.columns and roas is not None:
+            if len(roas) > 10:
+                # Positional order by date; sort_values keeps blank dates (NaN) last
+                dates = df['date'].reset_index(drop=True)
+                order = dates.sort_values(kind='stable', na_position='last').index.to_numpy()
+                quarter = len(order) // 4
+                recent_roas = np.nanmean(roas[order[-quarter:]])
+                early_roas = np.nanmean(roas[order[:quarter]])
                 
                 if recent_roas < early_roas * 0.8:
                     patterns.append("Declining ROAS trend detected")
         
-        # Check for low-performing campaigns
-        if 'roas' in df.columns:
-            low_performers = len(df[df['roas'] < 2.0])
-            if low_performers > len(df) * 0.3:
+        if roas is not None:
+            low_roas = roas < 2.0
+            
+            # Check for low-performing campaigns
+            low_performers = int(low_roas.sum())
+            if low_performers > len(roas) * 0.3:
                 patterns.append(f"{low_performers} campaigns with ROAS < 2.0")
-        
-        # Check for high spend low performance
-        if 'spend' in df.columns and 'roas' in df.columns:
-            high_spend_low_roas = df[(df['spend'] > df['spend'].quantile(0.75)) & 
-                                    (df['roas'] < 2.0)]
-            if len(high_spend_low_roas) > 0:
-                patterns.append(f"{len(high_spend_low_roas)} high-spend campaigns with low ROAS")
+            
+            # Check for high spend low performance
+            if spend is not None:
+                high_spend = spend > np.nanquantile(spend, 0.75)
+                high_spend_low_roas = int((high_spend & low_roas).sum())
+                if high_spend_low_roas > 0:
+                    patterns.append(f"{high_spend_low_roas} high-spend campaigns with low ROAS")
         
         return patterns
     
@@ -110,21 +119,27 @@ class DataAgent:
         outliers = {}
         
         if 'roas' in df.columns:
-            q1 = df['roas'].quantile(0.25)
-            q3 = df['roas'].quantile(0.75)
+            q1, q3 = df['roas'].quantile([0.25, 0.75])
             iqr = q3 - q1
             lower_bound = q1 - 1.5 * iqr
             upper_bound = q3 + 1.5 * iqr
             
-            outlier_df = df[(df['roas'] < lower_bound) | (df['roas'] > upper_bound)]
+            # Classify with boolean masks; the "high" mask doubles as the outlier type
+            roas = df['roas'].to_numpy(dtype=float)
+            is_high = roas > upper_bound
+            is_outlier = is_high | (roas < lower_bound)
+            
+            names = df['campaign_name'].to_numpy()[is_outlier]
+            values = roas[is_outlier]
+            types = np.where(is_high[is_outlier], "high", "low").tolist()
             
             outliers['roas'] = [
                 {
-                    "campaign": row['campaign_name'],
-                    "value": float(row['roas']),
-                    "type": "high" if row['roas'] > upper_bound else "low"
+                    "campaign": name,
+                    "value": _round_float32(value),
+                    "type": kind
                 }
-                for _, row in outlier_df.iterrows()
+                for name, value, kind in zip(names, values, types)
             ]
         
         return outliers
@@ -139,10 +154,10 @@ class DataAgent:
         return {
             "campaign_name": campaign_name,
             "record_count": len(campaign_data),
-            "avg_roas": float(campaign_data['roas'].mean()),
-            "avg_ctr": float(campaign_data['ctr'].mean()),
-            "total_spend": float(campaign_data['spend'].sum()),
-            "creative_samples": campaign_data['creative_message'].unique().tolist()[:3]
+            "avg_roas": _round_float32(campaign_data['roas'].astype('float64').mean()),
+            "avg_ctr": _round_float32(campaign_data['ctr'].astype('float64').mean()),
+            "total_spend": _round_float32(campaign_data['spend'].astype('float64').sum()),
+            "creative_samples": campaign_data['creative_message'].drop_duplicates().head(3).tolist()
         }
 
 
@@ -2,12 +2,24 @@
 Evaluator Agent: Validates hypotheses with quantitative metrics.
 """
 
-import json
+from statistics import fmean
 from typing import Dict, Any, List
 from loguru import logger
+import numpy as np
 import pandas as pd
 
 
+# Hypothesis title keyword -> quantitative check, in priority order
+_CHECK_KEYWORDS = (
+    ("creative", "creative_fatigue"),
+    ("fatigue", "creative_fatigue"),
+    ("audience", "audience"),
+    ("target", "audience"),
+    ("budget", "budget"),
+    ("spend", "budget")
+)
+
+
 class EvaluatorAgent:
     """
     Quantitative Evaluator that validates hypotheses with data-driven metrics.
@@ -15,7 +27,29 @@ class EvaluatorAgent:
     
     def __init__(self, llm, df: pd.DataFrame):
         self.llm = llm
+        
+        # Parse dates once, on a copy so the shared DataFrame is left untouched
+        if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+            df = df.copy()
+            df['date'] = pd.to_datetime(df['date'], errors='coerce')
         self.df = df
+        
+        # CTR of the oldest/newest records, reused by the creative fatigue check
+        self._older_ctr = None
+        self._recent_ctr = None
+        if 'date' in df.columns and 'ctr' in df.columns:
+            ctr = df['ctr'].to_numpy(dtype=float)
+            self._older_ctr = float(np.nanmean(ctr[:50])) if len(ctr) else float('nan')
+            self._recent_ctr = float(np.nanmean(ctr[-50:])) if len(ctr) else float('nan')
+        
+        # Quantitative checks by name; results depend only on df, so they are cached
+        self._checks = {
+            "creative_fatigue": self._check_creative_fatigue,
+            "audience": self._check_audience_issues,
+            "budget": self._check_budget_allocation
+        }
+        self._check_results = {}
+        
         self.role = "Quantitative Evaluator"
         self.goal = "Validate hypotheses with data-driven metrics"
         self.backstory = """Statistician focused on validating business hypotheses 
@@ -49,12 +83,9 @@ class EvaluatorAgent:
             validated['validated_hypotheses'].append(validation)
         
         # Calculate overall confidence
-        if validated['validated_hypotheses']:
-            avg_confidence = sum(
-                h.get('validation_score', 0.5) 
-                for h in validated['validated_hypotheses']
-            ) / len(validated['validated_hypotheses'])
-            validated['validation_confidence'] = avg_confidence
+        scores = [h.get('validation_score', 0.5) for h in validated['validated_hypotheses']]
+        if scores:
+            validated['validation_confidence'] = fmean(scores)
         
         # Generate recommendation
         validated['recommendation'] = self._generate_recommendation(validated['validated_hypotheses'])
@@ -76,15 +107,13 @@ class EvaluatorAgent:
         try:
             # Perform quantitative checks based on hypothesis title
             title_lower = hypothesis.get('title', '').lower()
+            check = next(
+                (name for keyword, name in _CHECK_KEYWORDS if keyword in title_lower),
+                None
+            )
             
-            if 'creative' in title_lower or 'fatigue' in title_lower:
-                validation.update(self._check_creative_fatigue())
-            
-            elif 'audience' in title_lower or 'target' in title_lower:
-                validation.update(self._check_audience_issues())
-            
-            elif 'budget' in title_lower or 'spend' in title_lower:
-                validation.update(self._check_budget_allocation())
+            if check is not None:
+                validation.update(self._run_check(check))
             
             else:
                 # Generic validation
@@ -106,6 +135,13 @@ class EvaluatorAgent:
         
         return validation
     
+    def _run_check(self, name: str) -> Dict[str, Any]:
+        """Run a quantitative check once per agent and return a copy of its result."""
+        if name not in self._check_results:
+            self._check_results[name] = self._checks[name]()
+        result = self._check_results[name]
+        return {"validation_score": result["validation_score"], "metrics": dict(result["metrics"])}
+    
     def _check_creative_fatigue(self) -> Dict[str, Any]:
         """Check for creative fatigue indicators."""
         metrics = {
@@ -115,10 +151,9 @@ class EvaluatorAgent:
         }
         
         # Simple heuristic: check if older creatives have lower CTR
-        if 'date' in self.df.columns and 'ctr' in self.df.columns:
-            self.df['date'] = pd.to_datetime(self.df['date'])
-            recent_ctr = self.df.tail(50)['ctr'].mean()
-            older_ctr = self.df.head(50)['ctr'].mean()
+        if self._recent_ctr is not None:
+            recent_ctr = self._recent_ctr
+            older_ctr = self._older_ctr
             
             if recent_ctr < older_ctr:
                 metrics['fatigue_indicator'] = True
@@ -138,12 +173,13 @@ class EvaluatorAgent:
     def _check_budget_allocation(self) -> Dict[str, Any]:
         """Check for budget allocation issues."""
         if 'spend' in self.df.columns and 'roas' in self.df.columns:
-            high_spend = self.df[self.df['spend'] > self.df['spend'].median()]
-            low_roas_high_spend = len(high_spend[high_spend['roas'] < 2.0])
+            spend = self.df['spend'].to_numpy(dtype=float)
+            roas = self.df['roas'].to_numpy(dtype=float)
+            inefficient = (spend > self.df['spend'].median()) & (roas < 2.0)
             
             metrics = {
-                "inefficient_campaigns": int(low_roas_high_spend),
-                "potential_waste": float(high_spend[high_spend['roas'] < 2.0]['spend'].sum())
+                "inefficient_campaigns": int(inefficient.sum()),
+                "potential_waste": float(spend[inefficient].sum())
             }
             
             return {"validation_score": 0.6, "metrics": metrics}
@@ -3,9 +3,16 @@ Insight Agent: Generates hypotheses explaining performance changes.
 """
 
 import json
+import re
 from typing import Dict, Any, List
 from loguru import logger
 
+from agents.prompt_loader import load_prompt
+from json_utils import extract_fenced_json
+
+# First number in a textual confidence such as "75%"
+_CONFIDENCE_RE = re.compile(r'\d+\.?\d*')
+
 
 class InsightAgent:
     """
@@ -18,6 +25,10 @@ class InsightAgent:
         self.goal = "Hypothesize root causes for performance changes"
         self.backstory = """Marketing consultant with expertise in diagnosing 
         campaign performance issues and identifying optimization opportunities."""
+        
+        # Last serialized data summary; the reflection retry reuses the same dict
+        self._last_summary = None
+        self._last_summary_json = ""
     
     def generate_insights(self, data_summary: Dict[str, Any], query: str) -> Dict[str, Any]:
         """
@@ -33,16 +44,7 @@ class InsightAgent:
         logger.info("Insight Agent generating hypotheses")
         
         # Read the insight prompt
-        try:
-            with open("../prompts/insight_prompt.md", "r") as f:
-                system_prompt = f.read()
-        except FileNotFoundError:
-            try:
-                with open("prompts/insight_prompt.md", "r") as f:
-                    system_prompt = f.read()
-            except FileNotFoundError:
-                logger.warning("Insight prompt file not found, using default")
-                system_prompt = "You are a business insight specialist."
+        system_prompt = load_prompt("insight_prompt.md", "You are a business insight specialist.")
         
         # Build the analysis prompt
         user_prompt = f"""
@@ -51,7 +53,7 @@ class InsightAgent:
         Query: {query}
         
         Data Summary:
-        {json.dumps(data_summary, indent=2)}
+        {self._dump_summary(data_summary)}
         
         Generate structured hypotheses about what's causing performance issues.
         Return JSON with hypotheses array, primary_cause, and recommended_actions.
@@ -75,15 +77,17 @@ class InsightAgent:
             logger.error(f"Error generating insights: {e}")
             return self._default_insights(data_summary)
     
+    def _dump_summary(self, data_summary: Dict[str, Any]) -> str:
+        """Serialize the data summary, reusing the previous dump for the same dict."""
+        if data_summary is not self._last_summary:
+            self._last_summary_json = json.dumps(data_summary, indent=2, default=str)
+            self._last_summary = data_summary
+        return self._last_summary_json
+    
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response into structured insights."""
-        response = response.strip()
-        
         # Extract JSON from markdown if present
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0].strip()
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0].strip()
+        response = extract_fenced_json(response)
         
         try:
             return json.loads(response)
@@ -107,19 +111,16 @@ class InsightAgent:
         if 'hypotheses' in insights:
             for hypothesis in insights['hypotheses']:
                 # Ensure confidence is a float between 0 and 1
-                if 'confidence' in hypothesis:
-                    confidence = hypothesis['confidence']
-                    if isinstance(confidence, str):
-                        # Try to extract number from string
-                        import re
-                        numbers = re.findall(r'\d+\.?\d*', confidence)
-                        if numbers:
-                            confidence = float(numbers[0]) / 100.0
-                        else:
-                            confidence = 0.5
-                    hypothesis['confidence'] = max(0.0, min(1.0, float(confidence)))
+                confidence = hypothesis.get('confidence', 0.5)
+                if isinstance(confidence, (int, float)):
+                    confidence = float(confidence)
+                elif isinstance(confidence, str):
+                    # Try to extract number from string
+                    match = _CONFIDENCE_RE.search(confidence)
+                    confidence = float(match.group()) / 100.0 if match else 0.5
                 else:
-                    hypothesis['confidence'] = 0.5
+                    confidence = 0.5
+                hypothesis['confidence'] = max(0.0, min(1.0, confidence))
         
         return insights
     
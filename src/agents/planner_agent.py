@@ -3,10 +3,17 @@ Planner Agent: Decomposes high-level queries into specific analysis tasks.
 """
 
 import json
+import re
 from typing import List, Dict, Any
 from loguru import logger
 from pydantic import BaseModel
 
+from agents.prompt_loader import load_prompt
+from json_utils import JsonStreamExtractor
+
+# Greedy outermost {...} block, used when the balanced scan fails to parse
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+
 
 class Task(BaseModel):
     """Represents a single analysis task."""
@@ -42,16 +49,7 @@ class PlannerAgent:
         logger.info(f"Planner received query: {query}")
         
         # Read the planner prompt
-        try:
-            with open("../prompts/planner_prompt.md", "r") as f:
-                system_prompt = f.read()
-        except FileNotFoundError:
-            try:
-                with open("prompts/planner_prompt.md", "r") as f:
-                    system_prompt = f.read()
-            except FileNotFoundError:
-                logger.warning("Planner prompt file not found, using default")
-                system_prompt = "You are a strategic marketing planner."
+        system_prompt = load_prompt("planner_prompt.md", "You are a strategic marketing planner.")
         
         # Build the task prompt
         user_prompt = f"""
@@ -86,25 +84,19 @@ class PlannerAgent:
     
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response into task plan."""
-        # Try to extract JSON from the response
-        response = response.strip()
+        # Prefer a ```json fence, otherwise the first object with a 'tasks' key,
+        # skipping braced prose such as "Plan for {query}:"
+        extractor = JsonStreamExtractor(accept=lambda value: 'tasks' in value)
+        if extractor.feed(response) is not None:
+            return extractor.value
+        logger.warning("Failed to parse JSON object, attempting to extract")
         
-        # Remove markdown code blocks if present
-        if "```json" in response:
-            response = response.split("```json")[1].split("```")[0].strip()
-        elif "```" in response:
-            response = response.split("```")[1].split("```")[0].strip()
-        
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse JSON, attempting to extract")
-            # Fallback: try to find JSON-like structures
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            raise
+        # Fallback: try to find JSON-like structures (only worth scanning if a brace exists)
+        json_match = _JSON_BLOCK_RE.search(response) if '{' in response else None
+        task_plan = json.loads(json_match.group() if json_match else response)
+        if not isinstance(task_plan, dict) or 'tasks' not in task_plan:
+            raise ValueError("Planner response has no 'tasks' object")
+        return task_plan
     
     def _default_tasks(self, query: str) -> List[Task]:
         """Generate default task plan if LLM fails."""
@@ -0,0 +1,29 @@
+"""
+Prompt Loader: Reads agent prompt files once and caches their contents.
+"""
+
+from functools import lru_cache
+from loguru import logger
+
+
+@lru_cache(maxsize=None)
+def load_prompt(name: str, default: str) -> str:
+    """
+    Load a prompt file from the prompts directory.
+
+    Args:
+        name: Prompt file name (e.g. "insight_prompt.md")
+        default: Prompt to use if the file cannot be found
+
+    Returns:
+        Prompt text
+    """
+    for path in (f"../prompts/{name}", f"prompts/{name}"):
+        try:
+            with open(path, "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            continue
+
+    logger.warning(f"Prompt file {name} not found, using default")
+    return default
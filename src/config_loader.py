@@ -0,0 +1,31 @@
+"""
+Config Loader: Parses the YAML configuration once per process.
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import yaml
+
+# libyaml-backed loader when available, pure-Python otherwise
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=None)
+def load_config(config_path: str = "config/config.yaml") -> Mapping[str, Any]:
+    """
+    Load a YAML configuration file.
+
+    The result is cached per path and shared between callers, so it is
+    returned as a read-only mapping.
+
+    Args:
+        config_path: Path to the configuration file
+
+    Returns:
+        Parsed configuration
+    """
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=_Loader) or {}
+    return MappingProxyType(config)
@@ -0,0 +1,196 @@
+"""
+Helpers for pulling JSON objects out of free-form LLM output.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Opening marker of a fenced JSON block; its contents are preferred over prose
+JSON_FENCE = "```json"
+
+# Body of the first ```json fenced block, and of the first plain ``` block
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)(?:```|\Z)", re.DOTALL)
+_FENCE_RE = re.compile(r"```\s*(.*?)(?:```|\Z)", re.DOTALL)
+
+
+class JsonObjectScanner:
+    """
+    Incremental matcher for the first balanced top-level JSON object in a text stream.
+
+    Text is fed in chunks; only the new characters are scanned, counting
+    brackets outside of string literals (honouring backslash escapes).
+    A match only starts at "{"; arrays count only once inside an object,
+    so bracketed prose such as "[0, 1]" or "[1]" is never a match.
+    Balanced braces are not necessarily valid JSON; see JsonStreamExtractor.
+    """
+
+    def __init__(self):
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._offset = 0
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """
+        Scan the next chunk of text.
+
+        Args:
+            chunk: Text following everything fed so far
+
+        Returns:
+            Absolute index of the object's closing brace once it has been
+            seen, otherwise None
+        """
+        if self.end is not None:
+            return self.end
+
+        for i, ch in enumerate(chunk):
+            if self.start is None:
+                if ch == "{":
+                    self.start = self._offset + i
+                    self._depth = 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{" or ch == "[":
+                self._depth += 1
+            elif ch == "}" or ch == "]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = self._offset + i
+                    break
+
+        self._offset += len(chunk)
+        return self.end
+
+
+class JsonStreamExtractor:
+    """
+    Finds the first JSON object in streamed text that actually parses.
+
+    Balanced spans that fail to parse (prose such as "the {analysis}") are
+    skipped and scanning resumes after their opening brace. Once a ```json
+    fence appears, scanning restarts inside it, so fenced JSON wins over
+    braced prose that has not parsed yet. Each chunk is scanned once; the
+    buffered text is only joined when a candidate object is checked.
+
+    Args:
+        accept: Optional check on a parsed object; rejected objects are
+            skipped and scanning resumes after them
+    """
+
+    def __init__(self, accept: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        self._accept = accept
+        self.span: Optional[Tuple[int, int]] = None
+        self.value: Any = None
+        self._parts = []
+        self._length = 0
+        self._tail = ""
+        self._fenced = False
+        self._restart(0)
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def _restart(self, origin: int):
+        """Start a fresh scan at text index origin."""
+        self._scanner = JsonObjectScanner()
+        self._origin = origin
+        self._fed = origin
+
+    def feed(self, chunk: str) -> Optional[Tuple[int, int]]:
+        """
+        Append the next chunk of text and keep scanning.
+
+        Args:
+            chunk: Text following everything fed so far
+
+        Returns:
+            (start, end) indices of the parsed object's braces once found,
+            otherwise None
+        """
+        if self.span is not None:
+            return self.span
+
+        old_length = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+
+        if not self._fenced:
+            # Only the new chunk plus a fence-sized overlap can hold a new fence
+            window = self._tail + chunk
+            fence = window.find(JSON_FENCE)
+            if fence != -1:
+                self._fenced = True
+                self._restart(old_length - len(self._tail) + fence + len(JSON_FENCE))
+            self._tail = window[-(len(JSON_FENCE) - 1):]
+
+        while True:
+            if self._fed >= old_length:
+                pending = chunk[self._fed - old_length:]
+            else:
+                # Rescanning after a restart reaches back into earlier chunks
+                pending = self.text[self._fed:]
+            end = self._scanner.feed(pending)
+            self._fed = self._length
+            if end is None:
+                return None
+
+            start = self._origin + self._scanner.start
+            end += self._origin
+            try:
+                value = json.loads(self.text[start:end + 1])
+            except ValueError:
+                # Not JSON after all; look for the next opening brace
+                self._restart(start + 1)
+                continue
+            if self._accept is not None and not self._accept(value):
+                # Valid JSON, but not what the caller wants; skip past it
+                self._restart(end + 1)
+                continue
+
+            self.value = value
+            self.span = (start, end)
+            return self.span
+
+
+def find_json_span(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Locate the first parseable JSON object in a string.
+
+    Args:
+        text: Raw text that may contain JSON, possibly in a ```json fence
+
+    Returns:
+        (start, end) indices of the object's opening and closing braces,
+        or None if no parseable object is found
+    """
+    return JsonStreamExtractor().feed(text)
+
+
+def extract_fenced_json(response: str) -> str:
+    """
+    Strip markdown fencing from an LLM response.
+
+    Args:
+        response: Raw LLM response text
+
+    Returns:
+        Body of the first ```json block, else of the first plain ``` block,
+        else the whole response; stripped of surrounding whitespace
+    """
+    match = _JSON_FENCE_RE.search(response) or _FENCE_RE.search(response)
+    return match.group(1).strip() if match else response.strip()
@@ -2,11 +2,20 @@
 LLM Wrapper for Groq API integration with Gemma model.
 """
 
+import hashlib
 import os
-from typing import Optional
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import httpx
 from loguru import logger
 from groq import Groq
-import yaml
+
+from config_loader import load_config
+from json_utils import JsonStreamExtractor, find_json_span
+
+# Upper bound on completions in flight at once from generate_many
+MAX_CONCURRENT_REQUESTS = 8
 
 
 class GroqLLM:
@@ -14,45 +23,171 @@ class GroqLLM:
     Wrapper for Groq API with Gemma model.
     """
     
-    def __init__(self, config_path: str = "config/config.yaml"):
-        """Initialize Groq LLM with configuration."""
+    def __init__(self, config_path: str = "config/config.yaml", config: Optional[Mapping[str, Any]] = None):
+        """Initialize Groq LLM with configuration (parsed from config_path unless given)."""
         # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = config if config is not None else load_config(config_path)
         
         self.api_config = self.config.get('api', {})
         self.model = self.api_config.get('model', 'gemma2-9b-it')
         self.temperature = self.api_config.get('temperature', 0.7)
         self.max_tokens = self.api_config.get('max_tokens', 2000)
+        self.timeout = self.api_config.get('timeout', 30)
+        
+        # On-disk cache of completions keyed by the exact prompts
+        cache_config = self.config.get('cache', {})
+        self.cache_enabled = cache_config.get('enabled', False)
+        self.cache_dir = cache_config.get('dir', os.path.join('cache', 'llm'))
+        
+        # In-memory completions for this run, checked before the on-disk cache
+        self._cache: Dict[Tuple[bytes, bytes, bool], str] = {}
         
         # Initialize Groq client
         api_key = os.getenv('GROQ_API_KEY')
+        self.api_key = api_key
+        self._http = None
         if not api_key:
             logger.warning("GROQ_API_KEY not found in environment. Using placeholder.")
             self.client = None
         else:
             try:
-                self.client = Groq(api_key=api_key)
+                # One pooled HTTP client, so concurrent and repeated calls reuse connections
+                timeout = httpx.Timeout(self.timeout)
+                self._http = httpx.Client(
+                    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                    timeout=timeout
+                )
+                self.client = Groq(api_key=api_key, http_client=self._http, timeout=timeout)
                 logger.info("Groq client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Groq client: {e}")
                 self.client = None
     
-    def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def close(self):
+        """Release pooled HTTP connections; the instance must not be used afterwards."""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+    
+    def generate(self, system_prompt: str, user_prompt: str, json_mode: bool = True) -> str:
         """
         Generate a response using the LLM.
         
         Args:
             system_prompt: System prompt for the model
             user_prompt: User prompt/query
+            json_mode: Stream the completion and stop reading once a complete
+                JSON object has parsed; disable for free-form text
             
         Returns:
             Generated response text
         """
+        cached = self._cache_get(system_prompt, user_prompt, json_mode)
+        if cached is not None:
+            return cached
+        
         if not self.client:
             logger.warning("Groq client not available, returning mock response")
             return self._mock_generate(system_prompt, user_prompt)
         
+        try:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            
+            if json_mode:
+                result = self._stream_json(messages)
+            else:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+                result = response.choices[0].message.content
+            
+            logger.info(f"Generated response ({len(result)} chars)")
+            self._cache_put(system_prompt, user_prompt, result, json_mode)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return self._mock_generate(system_prompt, user_prompt)
+    
+    def _stream_json(self, messages: List[Dict[str, str]]) -> str:
+        """Stream a completion, cutting it off after the first JSON object that parses."""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        
+        extractor = JsonStreamExtractor()
+        span = None
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if not content:
+                    continue
+                span = extractor.feed(content)
+                if span is not None:
+                    break
+        finally:
+            # Drops the connection so the server stops generating trailing text
+            stream.response.close()
+        
+        if span is None:
+            return extractor.text
+        start, end = span
+        return extractor.text[start:end + 1]
+    
+    def generate_many(self, prompts: List[Tuple[str, str]]) -> List[str]:
+        """
+        Generate responses for independent prompts concurrently.
+        
+        Args:
+            prompts: List of (system_prompt, user_prompt) pairs
+            
+        Returns:
+            Generated response texts, in the same order as prompts
+        """
+        results = [self._cache_get(system, user) for system, user in prompts]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        if not self.client:
+            logger.warning("Groq client not available, returning mock responses")
+            generated = [None] * len(pending)
+        else:
+            try:
+                generated = self._generate_concurrently([prompts[i] for i in pending])
+            except Exception as e:
+                logger.error(f"Error generating batched responses: {e}")
+                generated = [None] * len(pending)
+        
+        for i, result in zip(pending, generated):
+            system_prompt, user_prompt = prompts[i]
+            if result is None:
+                results[i] = self._mock_generate(system_prompt, user_prompt)
+            else:
+                self._cache_put(system_prompt, user_prompt, result)
+                results[i] = result
+        
+        return results
+    
+    def _generate_concurrently(self, prompts: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Issue completions in parallel threads on the pooled client; failed items come back as None."""
+        with ThreadPoolExecutor(max_workers=min(len(prompts), MAX_CONCURRENT_REQUESTS)) as executor:
+            return list(executor.map(lambda prompt: self._complete(*prompt), prompts))
+    
+    def _complete(self, system_prompt: str, user_prompt: str) -> Optional[str]:
+        """Run one blocking completion, returning None on failure."""
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -63,14 +198,87 @@ class GroqLLM:
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
-            
-            result = response.choices[0].message.content
-            logger.info(f"Generated response ({len(result)} chars)")
-            return result
-            
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return self._mock_generate(system_prompt, user_prompt)
+            return None
+        
+        result = response.choices[0].message.content
+        logger.info(f"Generated response ({len(result)} chars)")
+        return result
+    
+    def clear_cache(self):
+        """Forget the in-memory completions (the on-disk cache is kept)."""
+        self._cache.clear()
+    
+    @staticmethod
+    def _memory_key(system_prompt: str, user_prompt: str, json_mode: bool) -> Tuple[bytes, bytes, bool]:
+        """Compact in-memory cache key for a prompt pair."""
+        return (
+            hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=16).digest(),
+            hashlib.blake2b(user_prompt.encode("utf-8"), digest_size=16).digest(),
+            json_mode
+        )
+    
+    def _cache_path(self, system_prompt: str, user_prompt: str, json_mode: bool) -> str:
+        """Path of the cached completion for a prompt pair under the current model settings."""
+        # json_mode results are cut at the JSON object, so they never share an entry with full text
+        mode = "json" if json_mode else "text"
+        key = hashlib.blake2b(digest_size=20)
+        for part in (self.model, str(self.temperature), str(self.max_tokens), mode, system_prompt, user_prompt):
+            key.update(part.encode("utf-8"))
+            key.update(b"\0")
+        return os.path.join(self.cache_dir, f"{key.hexdigest()}.txt")
+    
+    def _cache_get(self, system_prompt: str, user_prompt: str, json_mode: bool = False) -> Optional[str]:
+        """Return a previously stored completion for identical prompts, if any."""
+        memory_key = self._memory_key(system_prompt, user_prompt, json_mode)
+        result = self._cache.get(memory_key)
+        if result is not None:
+            logger.info(f"Reusing response from this run ({len(result)} chars)")
+            return result
+        
+        if not self.cache_enabled:
+            return None
+        
+        path = self._cache_path(system_prompt, user_prompt, json_mode)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = f.read()
+        except OSError:
+            return None
+        
+        logger.info(f"Using cached response ({len(result)} chars)")
+        self._cache[memory_key] = result
+        return result
+    
+    def _cache_put(self, system_prompt: str, user_prompt: str, result: str, json_mode: bool = False):
+        """Store an API completion so identical prompts can skip the request."""
+        # Only completions holding a parseable JSON object are kept; a truncated
+        # or malformed answer would otherwise be replayed on every later run
+        if not result or find_json_span(result) is None:
+            return
+        
+        self._cache[self._memory_key(system_prompt, user_prompt, json_mode)] = result
+        if not self.cache_enabled:
+            return
+        
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file beside the entry and rename it into place, so a
+            # crash or concurrent writer never leaves a truncated entry behind
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.cache_dir,
+                                             suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                f.write(result)
+            os.replace(tmp_path, self._cache_path(system_prompt, user_prompt, json_mode))
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
     
     def _mock_generate(self, system_prompt: str, user_prompt: str) -> str:
         """Generate a mock response when API is unavailable."""
@@ -3,14 +3,19 @@ Main Orchestrator for the Kasparro Agentic Facebook Analyst.
 Coordinates multiple agents to analyze Facebook Ads performance.
 """
 
+import numpy as np
 import pandas as pd
 import json
-import yaml
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 from loguru import logger
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+from config_loader import load_config
 from llm_wrapper import GroqLLM
 from agents.planner_agent import PlannerAgent, Task
 from agents.data_agent import DataAgent
@@ -19,6 +24,47 @@ from agents.evaluator_agent import EvaluatorAgent
 from agents.creative_generator import CreativeGenerator
 
 
+# Repeated string columns stored as pandas categoricals
+CATEGORY_COLUMNS = ("campaign_name", "creative_message")
+
+# Metric columns stored at reduced precision; KPI analysis does not need 64 bits
+FLOAT32_COLUMNS = ("spend", "ctr", "roas")
+INT32_COLUMNS = ("impressions", "clicks")
+
+# Upper bound on tasks from one dependency layer running at the same time
+MAX_PARALLEL_TASKS = 8
+
+# Append-only execution trace, one JSON event per line
+EXECUTION_LOG_PATH = os.path.join("logs", "agent_logs.jsonl")
+
+# Directories every run writes to
+OUTPUT_DIRS = ("logs", "reports")
+
+# Directories already created by this process
+_DIRS_READY = set()
+
+
+def _ensure_dirs(*dirs: str):
+    """Create directories once per process; later calls for the same path are free."""
+    for path in dirs:
+        if path and path not in _DIRS_READY:
+            os.makedirs(path, exist_ok=True)
+            _DIRS_READY.add(path)
+
+
+def _json_default(value: Any) -> Any:
+    """Convert NumPy/pandas scalars (and anything else unknown) for JSON output."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _write_json(path: Union[str, Path], obj: Any):
+    """Encode obj in one pass and write it with a single call."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(obj, indent=2, default=_json_default))
+
+
 class Orchestrator:
     """
     Main orchestrator for the multi-agent system.
@@ -27,11 +73,11 @@ class Orchestrator:
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize orchestrator with configuration."""
         # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
+        _ensure_dirs(*OUTPUT_DIRS)
         
         # Initialize LLM
-        self.llm = GroqLLM(config_path)
+        self.llm = GroqLLM(config_path, config=self.config)
         
         # Initialize agents
         self.planner = PlannerAgent(self.llm)
@@ -40,7 +86,13 @@ class Orchestrator:
         self.evaluator_agent = None  # Initialize with data
         self.creative_generator = None  # Initialize with data
         
-        # Execution log
+        # Per-run agent results, so each agent's output is computed at most once
+        self._memo: Dict[str, Any] = {}
+        self._memo_locks: Dict[str, threading.Lock] = {}
+        self._memo_guard = threading.Lock()
+        
+        # Execution log; events are also appended to EXECUTION_LOG_PATH as they happen
+        self._log_fp = None
         self.execution_log = {
             "start_time": datetime.now().isoformat(),
             "query": "",
@@ -50,10 +102,21 @@ class Orchestrator:
             "status": "running"
         }
     
+    def close(self):
+        """Release the LLM client's connections once all analyses are done."""
+        self.llm.close()
+    
     def analyze(self, query: str, data_path: str = "data/sample_fb_ads.csv") -> Dict[str, Any]:
         """
         Main analysis pipeline.
         
+        The data summary is a pipeline precondition: it is computed once,
+        before any planned task runs, and stored under results["data_summary"].
+        Tasks that need it (including data_agent tasks) read that result
+        instead of rescanning the DataFrame. If the data agent fails, the
+        error is logged, an error summary ({"status": "error", ...}) is
+        stored in its place and the run continues, as a failing task would.
+        
         Args:
             query: Business question/query
             data_path: Path to the data file
@@ -64,6 +127,10 @@ class Orchestrator:
         logger.info(f"Starting analysis for query: {query}")
         self.execution_log["query"] = query
         self.execution_log["start_time"] = datetime.now().isoformat()
+        self._open_event_log()
+        # Completions are only reused within a run
+        self.llm.clear_cache()
+        self._log_event("run_started", query=query)
         
         try:
             # Load data
@@ -73,18 +140,36 @@ class Orchestrator:
             # Initialize agents that need data
             self.evaluator_agent = EvaluatorAgent(self.llm, df)
             self.creative_generator = CreativeGenerator(self.llm, df)
+            self._memo = {}
+            self._memo_locks = {}
             
             # Plan tasks
             tasks = self.planner.plan(query)
-            self.execution_log["tasks"] = [task.model_dump() for task in tasks]
+            # Dump each task once; the dicts are reused for logging and error payloads
+            task_dicts = [task.model_dump() for task in tasks]
+            self.execution_log["tasks"] = task_dicts
+            self._log_event("tasks_planned", tasks=task_dicts)
             
-            results = {}
+            # Summarize the data up front so every task reads the same summary
+            try:
+                data_summary = self.data_agent.analyze(df)
+            except Exception as e:
+                logger.error(f"Error summarizing data: {e}")
+                data_summary = {"status": "error", "error": str(e)}
+            self._memo["data_agent"] = data_summary
+            results = {"data_summary": data_summary}
+            self.execution_log["results"]["data_summary"] = data_summary
             
-            # Execute tasks
-            for task in tasks:
-                task_result = self._execute_task(task, df, query)
-                results[task.id] = task_result
-                self.execution_log["results"][task.id] = task_result
+            # Execute tasks layer by layer; tasks within a layer are independent
+            for layer in self._task_layers(tasks):
+                layer_tasks = [tasks[i] for i in layer]
+                layer_results = self._execute_layer(layer_tasks, df, query, [task_dicts[i] for i in layer])
+                
+                # Record on this thread, in plan order, once the whole layer is done
+                for task, task_result in zip(layer_tasks, layer_results):
+                    results[task.id] = task_result
+                    self.execution_log["results"][task.id] = task_result
+                    self._log_event("task_completed", task_id=task.id, agent=task.agent, result=task_result)
             
             # Compile initial report
             report = self._compile_report(query, results, df)
@@ -108,7 +193,7 @@ class Orchestrator:
                     # Regenerate insights with a refined query prompt
                     refined_query = f"{query} — focus on specific drivers (creative fatigue, audience drop, budget shifts)." \
                                     f" Provide tighter hypotheses with explicit evidence and numeric deltas."
-                    data_summary = results.get("data_summary") or self.data_agent.analyze(df)
+                    data_summary = self._get_data_summary()
                     refined_insights = self.insight_agent.generate_insights(data_summary, refined_query)
                     refined_validated = self.evaluator_agent.evaluate(refined_insights, data_summary)
 
@@ -130,6 +215,7 @@ class Orchestrator:
             
             self.execution_log["end_time"] = datetime.now().isoformat()
             self.execution_log["status"] = "completed"
+            self._log_event("run_completed")
             
             logger.info("Analysis completed successfully")
             return report
@@ -138,7 +224,36 @@ class Orchestrator:
             logger.error(f"Error in analysis: {e}")
             self.execution_log["status"] = "failed"
             self.execution_log["error"] = str(e)
+            self._log_event("run_failed", error=str(e))
             raise
+        
+        finally:
+            self._close_event_log()
+    
+    def _open_event_log(self):
+        """Open the append-only JSONL execution log for this run."""
+        self._close_event_log()
+        _ensure_dirs(os.path.dirname(EXECUTION_LOG_PATH))
+        # Unbuffered, so every event is on disk even if the run crashes
+        self._log_fp = open(EXECUTION_LOG_PATH, "ab", buffering=0)
+    
+    def _close_event_log(self):
+        """Close the JSONL execution log if it is open."""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+    
+    def _log_event(self, event: str, **fields: Any):
+        """Append one execution event as a JSON line."""
+        if self._log_fp is None:
+            return
+        entry = {"timestamp": datetime.now().isoformat(), "event": event, **fields}
+        self._log_fp.write((json.dumps(entry, default=_json_default) + "\n").encode("utf-8"))
+    
+    def export_execution_log(self, path: str = os.path.join("logs", "agent_logs.json")):
+        """Write the last run's execution log as a single JSON document."""
+        _ensure_dirs(os.path.dirname(path))
+        _write_json(path, self.execution_log)
     
     def _load_data(self, data_path: str) -> pd.DataFrame:
         """Load and preprocess the data.
@@ -148,21 +263,50 @@ class Orchestrator:
         env_csv = os.getenv("DATA_CSV")
         if env_csv and os.path.exists(env_csv):
             logger.info(f"Using DATA_CSV from environment: {env_csv}")
-            df = pd.read_csv(env_csv)
+            df = self._read_csv(env_csv)
             logger.info(f"Loaded data with columns: {df.columns.tolist()}")
-            return df
+            return self._optimize_dtypes(df)
 
         if not os.path.exists(data_path):
             logger.warning(f"Data file not found: {data_path}. Creating sample data.")
-            return self._create_sample_data()
+            return self._optimize_dtypes(self._create_sample_data())
         
-        df = pd.read_csv(data_path)
+        df = self._read_csv(data_path)
         logger.info(f"Loaded data with columns: {df.columns.tolist()}")
+        return self._optimize_dtypes(df)
+
+    def _read_csv(self, path: str) -> pd.DataFrame:
+        """Read a CSV, dictionary-encoding strings and narrowing floats while parsing."""
+        # Absent columns are ignored by read_csv. Integer columns are narrowed
+        # afterwards, since int32 parsing fails on blank cells.
+        dtype = {col: "category" for col in CATEGORY_COLUMNS}
+        dtype.update({col: "float32" for col in FLOAT32_COLUMNS})
+        return pd.read_csv(path, dtype=dtype)
+
+    def _optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store repeated string columns as categoricals and metrics at 32 bits.
+
+        Agents group by and compare on these columns; category codes make
+        those integer operations and shrink memory for repeated strings.
+        Narrower metric columns halve the memory scanned by aggregations.
+        """
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        
+        narrow = {col: "float32" for col in FLOAT32_COLUMNS if col in df.columns and df[col].dtype != np.float32}
+        # Integer columns holding blanks were parsed as float; leave those as-is
+        narrow.update({
+            col: "int32" for col in INT32_COLUMNS
+            if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and df[col].dtype != np.int32
+        })
+        if narrow:
+            df = df.astype(narrow)
         return df
 
     def _log_reflection_event(self, stage: str, reason: str, hypotheses: List[Dict[str, Any]], recommendations: List[Dict[str, Any]]):
         """Write a reflection loop event to a dedicated log file."""
-        os.makedirs("logs", exist_ok=True)
+        _ensure_dirs("logs")
         path = os.path.join("logs", "reflection_example.log")
         entry = {
             "timestamp": datetime.now().isoformat(),
@@ -182,7 +326,7 @@ class Orchestrator:
         after_hypotheses: List[Dict[str, Any]],
     ):
         """Log what changed after the retry pass."""
-        os.makedirs("logs", exist_ok=True)
+        _ensure_dirs("logs")
         path = os.path.join("logs", "reflection_example.log")
         before_titles = [h.get("title", "") for h in (before_hypotheses or [])]
         after_titles = [h.get("title", "") for h in (after_hypotheses or [])]
@@ -201,82 +345,137 @@ class Orchestrator:
     
     def _create_sample_data(self) -> pd.DataFrame:
         """Create sample data for testing."""
-        import numpy as np
-        
         logger.info("Creating sample Facebook Ads data")
         
         campaigns = ["Summer Sale", "Winter Collection", "Spring Promo", "Holiday Special", "New Year"]
         dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
         
-        data = []
-        for campaign in campaigns:
-            for i in range(50):
-                date = np.random.choice(dates)
-                data.append({
-                    'campaign_name': campaign,
-                    'date': str(date),
-                    'spend': np.random.uniform(50, 500),
-                    'impressions': np.random.randint(1000, 10000),
-                    'clicks': np.random.randint(20, 300),
-                    'ctr': np.random.uniform(0.01, 0.05),
-                    'roas': np.random.uniform(1.5, 5.0),
-                    'creative_message': f"{campaign} - Amazing deals await! Shop now."
-                })
-        
-        df = pd.DataFrame(data)
+        # 50 rows per campaign, generated column-wise in single NumPy calls
+        rng = np.random.default_rng()
+        campaign_col = np.repeat(campaigns, 50)
+        n = len(campaign_col)
+        
+        df = pd.DataFrame({
+            'campaign_name': campaign_col,
+            'date': rng.choice(dates.values, n).astype('datetime64[D]').astype(str),
+            'spend': rng.uniform(50, 500, n),
+            'impressions': rng.integers(1000, 10000, n),
+            'clicks': rng.integers(20, 300, n),
+            'ctr': rng.uniform(0.01, 0.05, n),
+            'roas': rng.uniform(1.5, 5.0, n)
+        })
+        df['creative_message'] = df['campaign_name'] + " - Amazing deals await! Shop now."
         
         # Ensure data directory exists
-        os.makedirs("data", exist_ok=True)
+        _ensure_dirs("data")
         df.to_csv("data/sample_fb_ads.csv", index=False)
         
         logger.info(f"Created sample data with {len(df)} records")
         return df
     
-    def _execute_task(self, task: Task, df: pd.DataFrame, query: str) -> Dict[str, Any]:
-        """Execute a specific task."""
+    def _task_layers(self, tasks: List[Task]) -> List[List[int]]:
+        """Group task indices into layers that only depend on earlier layers (planner order otherwise).
+        
+        Tasks are tracked by position, since the planner may repeat an id.
+        """
+        ids = {task.id for task in tasks}
+        remaining = {i: {dep for dep in task.dependencies if dep in ids} for i, task in enumerate(tasks)}
+        layers = []
+        done = set()
+        
+        while remaining:
+            ready = [i for i, deps in remaining.items() if deps <= done]
+            if not ready:
+                # Cyclic dependencies: fall back to planner order for the rest
+                logger.warning("Task dependencies contain a cycle; running remaining tasks in plan order")
+                layers.extend([i] for i in remaining)
+                break
+            for i in ready:
+                del remaining[i]
+            done.update(tasks[i].id for i in ready)
+            layers.append(ready)
+        
+        return layers
+    
+    def _execute_layer(self,
+                       layer: List[Task],
+                       df: pd.DataFrame,
+                       query: str,
+                       task_dicts: List[Dict[str, Any]]) -> List[Any]:
+        """Execute independent tasks concurrently so their LLM calls overlap; results keep layer order."""
+        if len(layer) == 1:
+            return [self._execute_task(layer[0], df, query, task_dicts[0])]
+        
+        with ThreadPoolExecutor(max_workers=min(len(layer), MAX_PARALLEL_TASKS)) as executor:
+            futures = [
+                executor.submit(self._execute_task, task, df, query, task_dict)
+                for task, task_dict in zip(layer, task_dicts)
+            ]
+            return [future.result() for future in futures]
+    
+    def _memoized(self, agent: str, compute):
+        """Return this run's result for an agent, computing it on first use (thread-safe)."""
+        # One lock per agent: concurrent callers wait for a single computation,
+        # while different agents can still compute in parallel
+        with self._memo_guard:
+            lock = self._memo_locks.setdefault(agent, threading.Lock())
+        with lock:
+            if agent not in self._memo:
+                self._memo[agent] = compute()
+            return self._memo[agent]
+    
+    def _get_data_summary(self) -> Dict[str, Any]:
+        """Data agent summary for this run (computed by analyze before any task)."""
+        return self._memo["data_agent"]
+    
+    def _get_insights(self, df: pd.DataFrame, query: str) -> Dict[str, Any]:
+        """Insight agent hypotheses for this run."""
+        return self._memoized(
+            "insight_agent",
+            lambda: self.insight_agent.generate_insights(self._get_data_summary(), query)
+        )
+    
+    def _get_evaluation(self, df: pd.DataFrame, query: str) -> Dict[str, Any]:
+        """Evaluator agent validation for this run."""
+        return self._memoized(
+            "evaluator_agent",
+            lambda: self.evaluator_agent.evaluate(self._get_insights(df, query), self._get_data_summary())
+        )
+    
+    def _execute_task(self, task: Task, df: pd.DataFrame, query: str, task_dict: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute a specific task (task_dict is its precomputed model_dump, if available)."""
+        if task_dict is None:
+            task_dict = task.model_dump()
         logger.info(f"Executing task: {task.id} ({task.agent})")
         
         try:
             if task.agent == "data_agent":
-                return self.data_agent.analyze(df)
+                return self._get_data_summary()
             
             elif task.agent == "insight_agent":
-                # Get data summary first
-                data_summary = self.execution_log["results"].get("data_summary", {})
-                if not data_summary:
-                    data_summary = self.data_agent.analyze(df)
-                return self.insight_agent.generate_insights(data_summary, query)
+                return self._get_insights(df, query)
             
             elif task.agent == "evaluator_agent":
-                # Get insights first
-                insights = self.execution_log["results"].get("insights", {})
-                if not insights:
-                    data_summary = self.execution_log["results"].get("data_summary", {})
-                    insights = self.insight_agent.generate_insights(data_summary, query)
-                
-                data_summary = self.execution_log["results"].get("data_summary", {})
-                return self.evaluator_agent.evaluate(insights, data_summary)
+                return self._get_evaluation(df, query)
             
             elif task.agent == "creative_agent":
-                # Get insights and validations
-                insights = self.execution_log["results"].get("insights", {})
-                validated = self.execution_log["results"].get("evaluation", {})
-                
-                if not validated:
-                    data_summary = self.execution_log["results"].get("data_summary", {})
-                    insights = self.insight_agent.generate_insights(data_summary, query)
-                    validated = self.evaluator_agent.evaluate(insights, data_summary)
-                
                 num_suggestions = self.config.get('creative', {}).get('num_suggestions', 5)
-                return self.creative_generator.generate_creatives(insights, validated, num_suggestions)
+                return self._memoized(
+                    "creative_agent",
+                    lambda: self.creative_generator.generate_creatives(
+                        self._get_insights(df, query),
+                        self._get_evaluation(df, query),
+                        num_suggestions
+                    )
+                )
             
             else:
                 logger.warning(f"Unknown agent: {task.agent}")
-                return {"status": "unknown_agent", "task": task.model_dump()}
+                return {"status": "unknown_agent", "task": task_dict}
                 
         except Exception as e:
             logger.error(f"Error executing task {task.id}: {e}")
-            return {"status": "error", "error": str(e), "task": task.model_dump()}
+            return {"status": "error", "error": str(e), "task": task_dict}
     
     def _compile_report(self, query: str, results: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
         """Compile final report from all results."""
@@ -316,7 +515,7 @@ class Orchestrator:
             "timestamp": datetime.now().isoformat(),
             "summary": {
                 "total_records": len(df),
-                "total_campaigns": len(df['campaign_name'].unique()) if 'campaign_name' in df.columns else 0,
+                "total_campaigns": self._count_campaigns(df),
                 "analysis_status": "completed"
             },
             "data_summary": data_summary,
@@ -328,6 +527,17 @@ class Orchestrator:
         
         return report
     
+    def _count_campaigns(self, df: pd.DataFrame) -> int:
+        """Number of distinct campaigns; O(1) for the categorical column set up at load."""
+        if 'campaign_name' not in df.columns:
+            return 0
+        
+        campaigns = df['campaign_name']
+        if isinstance(campaigns.dtype, pd.CategoricalDtype):
+            # Categories come straight from the loaded rows, so none are unused
+            return campaigns.cat.categories.size
+        return campaigns.nunique()
+    
     def _extract_recommendations(self, validated_insights: Dict[str, Any] = None, insights: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Extract actionable recommendations from results."""
         recommendations = []
@@ -358,8 +568,8 @@ class Orchestrator:
     
     def save_results(self, results: Dict[str, Any], output_dir: str = "reports"):
         """Save results to files."""
-        os.makedirs(output_dir, exist_ok=True)
-        os.makedirs("logs", exist_ok=True)
+        _ensure_dirs(output_dir)
+        out = Path(output_dir)
         
         # Save insights as JSON
         insights = results.get("insights", {})
@@ -368,29 +578,23 @@ class Orchestrator:
             "hypotheses": insights.get("hypotheses", []) if isinstance(insights, dict) else [],
             "validated": validated
         }
-        with open(f"{output_dir}/insights.json", "w") as f:
-            json.dump(insights_json, f, indent=2)
+        _write_json(out / "insights.json", insights_json)
         
         # Save creatives as JSON
         creatives_json = results.get("creative_suggestions", [])
-        with open(f"{output_dir}/creatives.json", "w") as f:
-            json.dump(creatives_json, f, indent=2)
+        _write_json(out / "creatives.json", creatives_json)
         
         # Save report as markdown
         report_md = self._generate_markdown_report(results)
-        with open(f"{output_dir}/report.md", "w") as f:
+        with open(out / "report.md", "w") as f:
             f.write(report_md)
         
-        # Save execution log
-        with open("logs/agent_logs.json", "w") as f:
-            json.dump(self.execution_log, f, indent=2)
-        
         logger.info(f"Results saved to {output_dir}/")
     
     def _generate_markdown_report(self, results: Dict[str, Any]) -> str:
         """Generate human-readable markdown report."""
         
-        md = f"""# Facebook Ads Performance Analysis Report
+        parts = [f"""# Facebook Ads Performance Analysis Report
 
 ## Query
 {results.get('query', 'N/A')}
@@ -409,55 +613,52 @@ class Orchestrator:
 
 ## Key Insights
 
-"""
+"""]
         
         # Add insights
         insights = results.get("insights", {})
         if "hypotheses" in insights:
-            md += "### Performance Hypotheses\n\n"
+            parts.append("### Performance Hypotheses\n\n")
             for hyp in insights["hypotheses"]:
-                md += f"**{hyp.get('title', 'N/A')}** (Confidence: {hyp.get('confidence', 0):.1%})\n"
-                md += f"- {hyp.get('description', 'N/A')}\n\n"
+                parts.append(f"**{hyp.get('title', 'N/A')}** (Confidence: {hyp.get('confidence', 0):.1%})\n")
+                parts.append(f"- {hyp.get('description', 'N/A')}\n\n")
         
         # Add validated insights
         validated = results.get("validated_insights", {})
         if "validated_hypotheses" in validated:
-            md += "### Validated Insights\n\n"
+            parts.append("### Validated Insights\n\n")
             for vh in validated["validated_hypotheses"]:
                 score = vh.get('validation_score', 0)
-                md += f"**{vh.get('title', 'N/A')}** - Validation Score: {score:.1%}\n"
-                md += f"- Strength: {vh.get('strength', 'N/A')}\n"
-                md += f"- Is Valid: {'Yes' if vh.get('is_valid', False) else 'No'}\n\n"
+                parts.append(f"**{vh.get('title', 'N/A')}** - Validation Score: {score:.1%}\n")
+                parts.append(f"- Strength: {vh.get('strength', 'N/A')}\n")
+                parts.append(f"- Is Valid: {'Yes' if vh.get('is_valid', False) else 'No'}\n\n")
         
         # Add recommendations
         recommendations = results.get("recommendations", [])
         if recommendations:
-            md += "## Recommended Actions\n\n"
+            parts.append("## Recommended Actions\n\n")
             for i, rec in enumerate(recommendations, 1):
-                md += f"{i}. **{rec.get('action', rec.get('description', 'N/A'))}**\n"
-                md += f"   - Priority: {rec.get('priority', 'medium').upper()}\n"
-                md += f"   - Expected Impact: {rec.get('expected_impact', 'Positive')}\n\n"
+                parts.append(f"{i}. **{rec.get('action', rec.get('description', 'N/A'))}**\n")
+                parts.append(f"   - Priority: {rec.get('priority', 'medium').upper()}\n")
+                parts.append(f"   - Expected Impact: {rec.get('expected_impact', 'Positive')}\n\n")
         
         # Add creative suggestions
         creatives = results.get("creative_suggestions", [])
         if creatives:
-            md += "## Creative Suggestions\n\n"
-            campaigns = {}
+            parts.append("## Creative Suggestions\n\n")
+            campaigns = defaultdict(list)
             for creative in creatives:
-                campaign = creative.get('campaign_name', 'Unknown')
-                if campaign not in campaigns:
-                    campaigns[campaign] = []
-                campaigns[campaign].append(creative)
+                campaigns[creative.get('campaign_name', 'Unknown')].append(creative)
             
             for campaign, campaign_creatives in campaigns.items():
-                md += f"### {campaign}\n\n"
+                parts.append(f"### {campaign}\n\n")
                 for creative in campaign_creatives[:3]:  # Show top 3
-                    md += f"**{creative.get('angle', 'Creative')}**\n"
-                    md += f"- Headline: {creative.get('headline', 'N/A')}\n"
-                    md += f"- Message: {creative.get('message', 'N/A')[:100]}...\n"
-                    md += f"- Target CTR: {creative.get('target_ctr', 'N/A')}\n\n"
+                    parts.append(f"**{creative.get('angle', 'Creative')}**\n")
+                    parts.append(f"- Headline: {creative.get('headline', 'N/A')}\n")
+                    parts.append(f"- Message: {creative.get('message', 'N/A')[:100]}...\n")
+                    parts.append(f"- Target CTR: {creative.get('target_ctr', 'N/A')}\n\n")
         
-        md += "\n---\n\n*Generated by Kasparro Agentic Facebook Analyst*"
+        parts.append("\n---\n\n*Generated by Kasparro Agentic Facebook Analyst*")
         
-        return md
+        return "".join(parts)
 
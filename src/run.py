@@ -5,25 +5,16 @@ Entry point for Kasparro Agentic Facebook Analyst.
 import sys
 import argparse
 import os
-from loguru import logger
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
 from pathlib import Path
 
-import sys
 sys.path.insert(0, '..' if sys.path[0] != '' else '.')
 
-from orchestrator import Orchestrator
-
-# Fix Windows console encoding
-if sys.platform == "win32":
-    os.environ["PYTHONIOENCODING"] = "utf-8"
-
 
 def setup_logging():
     """Configure logging."""
-    os.makedirs("logs", exist_ok=True)
+    from loguru import logger
+    
+    # The file sink creates logs/ if needed
     logger.add(
         "logs/app.log",
         rotation="10 MB",
@@ -71,8 +62,11 @@ def main():
     
     args = parser.parse_args()
     
-    # Setup console and logging
-    console = Console(legacy_windows=False, force_terminal=True)
+    # Heavy imports (pandas, groq, agents) only once there is work to do
+    from loguru import logger
+    from orchestrator import Orchestrator
+    
+    # Setup logging
     setup_logging()
     
     # Display banner
@@ -81,6 +75,7 @@ def main():
     print(f"Query: {args.query}")
     print(f"Data: {args.data}\n")
     
+    orchestrator = None
     try:
         # Initialize orchestrator
         orchestrator = Orchestrator(args.config)
@@ -92,6 +87,7 @@ def main():
         # Save results
         print("Saving results...")
         orchestrator.save_results(results)
+        orchestrator.export_execution_log()
         
         # Display summary
         print("\n=== Analysis Complete ===\n")
@@ -106,6 +102,7 @@ def main():
         print("   - reports/insights.json")
         print("   - reports/creatives.json")
         print("   - logs/agent_logs.json")
+        print("   - logs/agent_logs.jsonl")
         
         # Show recommendations
         recommendations = results.get("recommendations", [])
@@ -122,8 +119,16 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    
+    finally:
+        if orchestrator is not None:
+            orchestrator.close()
 
 
 if __name__ == "__main__":
+    # Fix Windows console encoding
+    if sys.platform == "win32":
+        os.environ["PYTHONIOENCODING"] = "utf-8"
+    
     main()
 